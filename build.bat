@@ -19,15 +19,26 @@ if errorlevel 1 (
     exit /b 1
 )
 
-REM Build the C++ extension
+REM Build the C++ extension into build\<ABI tag>, the directory the program
+REM imports it from ahead of anything else
 echo Building C++ extension...
-python setup.py build_ext --inplace
+for /f "usebackq delims=" %%i in (`python -c "import sys, sysconfig; print(sysconfig.get_config_var('SOABI') or sys.implementation.cache_tag)"`) do set BUILD_LIB=build\%%i
+python setup.py build_ext --build-lib "%BUILD_LIB%"
 if errorlevel 1 (
     echo Error: Failed to build C++ extension
     echo Falling back to Python-only mode...
     echo.
 )
 
+REM Optionally compile the launcher to a native binary with Nuitka
+if "%BUILD_NATIVE_LAUNCHER%"=="1" (
+    echo Building native launcher with Nuitka...
+    python -m nuitka --standalone --enable-plugin=tk-inter --include-data-file=requirements.txt=requirements.txt launcher.py
+    if errorlevel 1 (
+        echo Warning: Failed to build native launcher - use launcher.py instead
+    )
+)
+
 echo.
 echo Build complete!
 echo.
@@ -25,15 +25,27 @@ if [ $? -ne 0 ]; then
     exit 1
 fi
 
-# Build the C++ extension
+# Build the C++ extension into build/<ABI tag>, the directory the program
+# imports it from ahead of anything else
 echo "Building C++ extension..."
-$PYTHON_CMD setup.py build_ext --inplace
+BUILD_LIB=build/$($PYTHON_CMD -c "import sys, sysconfig; print(sysconfig.get_config_var('SOABI') or sys.implementation.cache_tag)")
+$PYTHON_CMD setup.py build_ext --build-lib "$BUILD_LIB"
 if [ $? -ne 0 ]; then
     echo "Error: Failed to build C++ extension"
     echo "Falling back to Python-only mode..."
     echo
 fi
 
+# Optionally compile the launcher to a native binary with Nuitka
+if [ "$BUILD_NATIVE_LAUNCHER" = "1" ]; then
+    echo "Building native launcher with Nuitka..."
+    $PYTHON_CMD -m nuitka --standalone --enable-plugin=tk-inter \
+        --include-data-file=requirements.txt=requirements.txt launcher.py
+    if [ $? -ne 0 ]; then
+        echo "Warning: Failed to build native launcher - use launcher.py instead"
+    fi
+fi
+
 echo
 echo "Build complete!"
 echo
@@ -6,10 +6,343 @@ Automatically sets up and runs the program without needing terminal access
 
 import os
 import sys
-import subprocess
+import json
+import glob
+import shutil
+import hashlib
+import importlib
+import importlib.util
+import sysconfig
 import tkinter as tk
-from tkinter import messagebox, ttk
+from tkinter import ttk
 import threading
+import queue
+import collections
+import multiprocessing
+
+# Setup results are cached here so warm launches can skip the environment probe
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "game_translator")
+STATE_FILE = os.path.join(CACHE_DIR, "state.json")
+PIP_CACHE_DIR = os.path.join(CACHE_DIR, "pip")
+
+# The project files sit next to this script, wherever the launcher is started from
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+REQUIREMENTS_FILE = os.path.join(PROJECT_DIR, "requirements.txt")
+SETUP_SCRIPT = os.path.join(PROJECT_DIR, "setup.py")
+
+# The C++ module is built into a directory per Python ABI, so switching
+# interpreters picks up the matching build instead of forcing a rebuild; the
+# path is the one game_translator.py imports from
+BUILD_LIB_DIR = os.path.join(PROJECT_DIR, "build", 
+                             sysconfig.get_config_var("SOABI") or sys.implementation.cache_tag)
+if BUILD_LIB_DIR not in sys.path:
+    sys.path.insert(0, BUILD_LIB_DIR)
+
+def _python_executable():
+    """Interpreter for running pip and setup.py (never a frozen launcher binary)"""
+    if "__compiled__" in globals() or getattr(sys, "frozen", False):
+        return shutil.which("python3") or shutil.which("python") or sys.executable
+    return sys.executable
+
+def _env_fingerprint():
+    """Hash of the inputs that decide whether setup has to run again"""
+    try:
+        with open(REQUIREMENTS_FILE, "rb") as f:
+            requirements = f.read()
+        setup_mtime = os.path.getmtime(SETUP_SCRIPT)
+    except OSError:
+        return None
+    data = requirements + _python_executable().encode() + str(setup_mtime).encode()
+    return hashlib.blake2b(data).hexdigest()
+
+def _missing_requirements():
+    """Return the lines of requirements.txt that are not satisfied yet"""
+    with open(REQUIREMENTS_FILE, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    lines = [line for line in lines if line and not line.startswith("#")]
+    
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+        from packaging.requirements import Requirement, InvalidRequirement
+    except ImportError:
+        # Can't tell what is installed - let pip sort it out
+        return lines
+        
+    missing = []
+    for line in lines:
+        try:
+            requirement = Requirement(line)
+        except InvalidRequirement:
+            missing.append(line)
+            continue
+        if requirement.marker is not None and not requirement.marker.evaluate():
+            continue
+        try:
+            installed = version(requirement.name)
+        except PackageNotFoundError:
+            missing.append(line)
+            continue
+        if installed not in requirement.specifier:
+            missing.append(line)
+    return missing
+
+def _extension_up_to_date():
+    """True if a built C++ module exists and is newer than all of its sources"""
+    built = (glob.glob(os.path.join(BUILD_LIB_DIR, "text_extractor*.so")) + 
+             glob.glob(os.path.join(BUILD_LIB_DIR, "text_extractor*.pyd")))
+    sources = glob.glob(os.path.join(PROJECT_DIR, "*.cpp")) + glob.glob(os.path.join(PROJECT_DIR, "*.h"))
+    if not built or not sources:
+        return False
+    # Changing the build flags in setup.py also needs a rebuild
+    sources.append(SETUP_SCRIPT)
+    newest_source = max(os.path.getmtime(source) for source in sources)
+    return all(os.path.getmtime(module) >= newest_source for module in built)
+
+def _build_env():
+    """Environment for the extension build, routed through ccache when available"""
+    env = os.environ.copy()
+    if shutil.which("ccache"):
+        for var, default in (("CC", "cc"), ("CXX", "c++")):
+            compiler = env.get(var, default)
+            if not compiler.startswith("ccache"):
+                env[var] = f"ccache {compiler}"
+        env["CCACHE_COMPILERCHECK"] = "content"
+    return env
+
+def _load_state():
+    """Read the cached setup state, or an empty dict if there is none"""
+    try:
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_state(state):
+    """Persist the setup state for the next launch"""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(STATE_FILE, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+    except OSError:
+        pass
+
+# Environment probes: (modules to look for, in order of preference,
+# whether the launcher can't work without it, name shown when found,
+# message shown when missing)
+PROBES = (
+    (("tkinter",), True, "tkinter", "ERROR: tkinter is not available!"),
+    (("nanobind", "pybind11"), False, None, "⚠ nanobind not found - will install it"),
+    (("text_extractor",), False, "C++ optimization module", 
+     "⚠ C++ module not found - will try to build it"),
+)
+
+# Setup runs in a spawned child process; spawn avoids forking the Tk interpreter
+_MP_CONTEXT = multiprocessing.get_context("spawn")
+
+# Queue the setup worker reports log lines and progress through
+_setup_queue = None
+
+# Set by the launcher window when the user cancels the setup
+_cancel_event = None
+
+class _SetupCancelled(Exception):
+    """Raised inside the setup worker once the user has cancelled"""
+
+def _init_setup_worker(setup_queue, cancel_event):
+    """Initializer for the setup worker process"""
+    global _setup_queue, _cancel_event
+    _setup_queue = setup_queue
+    _cancel_event = cancel_event
+
+def _report(message):
+    """Send a log line from the setup worker to the launcher window"""
+    _setup_queue.put(("log", message))
+
+def _report_progress(value):
+    """Send a progress bar value from the setup worker to the launcher window"""
+    _setup_queue.put(("progress", value))
+
+def _run_command(cmd, timeout=300, env=None, cwd=None):
+    """Run a command, streaming its output into the log line by line"""
+    import subprocess
+    import time
+    
+    # The command runs in a process group of its own, so cancel and the timeout
+    # also stop what it started (compilers under setup.py, builds under pip).
+    # Being able to cancel the whole group matters more than the faster launch
+    # posix_spawn gave, which subprocess only uses without a new session, so
+    # commands are started through fork+exec again
+    if sys.platform == "win32":
+        group_args = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        group_args = {"start_new_session": True}
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, 
+                            text=True, errors="replace", bufsize=1, env=env, cwd=cwd, 
+                            **group_args)
+    
+    # Read the pipe on a helper thread so the loop below can check for cancel
+    # and the timeout every 0.1s on every platform (select can't poll pipes on Windows)
+    lines = queue.Queue()
+    def read_output():
+        with proc.stdout:
+            for line in proc.stdout:
+                lines.put(line)
+        lines.put(None)
+    threading.Thread(target=read_output, daemon=True).start()
+    
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            line = lines.get(timeout=0.1)
+        except queue.Empty:
+            line = ""
+        if line is None:
+            break
+        if line:
+            _report(line.rstrip())
+        if _cancel_event.is_set():
+            _kill_process_group(proc)
+            raise _SetupCancelled()
+        if time.monotonic() > deadline:
+            _kill_process_group(proc)
+            raise subprocess.TimeoutExpired(cmd, timeout)
+    return proc.wait()
+
+def _kill_process_group(proc):
+    """Kill a command started by _run_command together with every process it started"""
+    import subprocess
+    import signal
+    
+    if sys.platform == "win32":
+        # taskkill /T follows the parent links down from the command
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    else:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            # The whole group already exited
+            pass
+    proc.wait()
+
+def _pip_install(args):
+    """Run pip install; it goes through _run_command so cancel and the timeout apply"""
+    # pip is deliberately not imported and run inside the worker, although that
+    # would save an interpreter start: there, nothing could cancel it, time it
+    # out or stop the builds it starts
+    return _run_command([_python_executable(), "-m", "pip", "install", *args])
+
+def _do_pip(missing):
+    """Install the missing requirements; returns True if they are all satisfied"""
+    import subprocess
+    
+    try:
+        if not missing:
+            _report("✓ All requirements already satisfied")
+            return True
+            
+        pip_args = ["--disable-pip-version-check", "--no-input", "--cache-dir", PIP_CACHE_DIR]
+        
+        # Prefer wheels to avoid compiling dependencies from source
+        returncode = _pip_install(pip_args + ["--prefer-binary", *missing])
+        if returncode != 0 and not _cancel_event.is_set():
+            _report("⚠ Install with --prefer-binary failed - retrying without it")
+            returncode = _pip_install(pip_args + missing)
+        if returncode == 0:
+            _report("✓ Requirements installed successfully")
+            return True
+        _report(f"⚠ Warning installing requirements: pip exited with code {returncode}")
+        return False
+    except _SetupCancelled:
+        _report("⚠ Requirement install cancelled")
+        return False
+    except subprocess.TimeoutExpired:
+        _report("⚠ Timeout installing requirements - continuing anyway")
+        return False
+    except Exception as e:
+        _report(f"⚠ Error installing requirements: {e}")
+        return False
+
+def _do_build_ext():
+    """Build the C++ module unless the built copy is already up to date"""
+    import subprocess
+    
+    if _cancel_event.is_set():
+        return
+        
+    _report("Building C++ optimization module...")
+    try:
+        if _extension_up_to_date():
+            _report("✓ C++ module up to date, skipping build")
+        else:
+            # setup.py names its sources relative to the project, and puts its
+            # temporary build files under it too
+            returncode = _run_command([_python_executable(), SETUP_SCRIPT, "build_ext", 
+                                       "--build-lib", BUILD_LIB_DIR], 
+                                      env=_build_env(), cwd=PROJECT_DIR)
+            if returncode == 0:
+                _report("✓ C++ module built successfully")
+            else:
+                _report(f"⚠ C++ module build failed with code {returncode}")
+                _report("Program will use Python-only mode")
+    except _SetupCancelled:
+        _report("⚠ C++ module build cancelled")
+    except subprocess.TimeoutExpired:
+        _report("⚠ Timeout building C++ module - using Python mode")
+    except Exception as e:
+        _report(f"⚠ Error building C++ module: {e}")
+        _report("Program will use Python-only mode")
+
+def _run_setup_in_subproc():
+    """Install requirements and build the C++ module (runs in the worker process)"""
+    import concurrent.futures
+    
+    # Install requirements
+    _report("Installing requirements...")
+    _report_progress(10)
+    
+    # Only shell out to pip for requirements that aren't installed yet
+    try:
+        missing = _missing_requirements()
+    except OSError as e:
+        _report(f"⚠ Error reading requirements: {e}")
+        missing = []
+        
+    # The build only has to wait for pip if pip is installing the binding library
+    binding_missing = any(name in line.lower() for line in missing 
+                          for name in ("nanobind", "pybind11"))
+    
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+        pip_future = pool.submit(_do_pip, missing)
+        if binding_missing:
+            pip_future.wait()
+        build_future = pool.submit(_do_build_ext)
+        
+        progress = 10
+        for _ in concurrent.futures.as_completed([pip_future, build_future]):
+            progress += 45
+            _report_progress(progress)
+        requirements_ok = pip_future.result()
+        build_future.result()
+        
+    if _cancel_event.is_set():
+        _report("\n=== Setup Cancelled ===")
+        return {"requirements_ok": False, "cpp_working": False, "cancelled": True}
+        
+    # Check final status
+    try:
+        # The build directory may not have existed when the import system last looked
+        importlib.invalidate_caches()
+        import text_extractor
+        _report("✓ C++ optimization module is working!")
+        cpp_working = True
+    except ImportError:
+        _report("✓ Using Python-only mode (still fast!)")
+        cpp_working = False
+        
+    _report("\n=== Setup Complete ===")
+    _report("You can now run the Game Text Translator!")
+    return {"requirements_ok": requirements_ok, "cpp_working": cpp_working}
 
 class GameTranslatorLauncher:
     def __init__(self):
@@ -18,8 +351,34 @@ class GameTranslatorLauncher:
         self.root.geometry("600x400")
         self.root.resizable(False, False)
         
+        # Environment probe results, handed from the worker thread to the UI.
+        # _drain_log polls it, because only the Tk thread may call into Tk
+        self.env_queue = queue.Queue()
+        
+        # Log lines and progress updates from any thread, drained into the widgets
+        # by the UI
+        self.log_queue = queue.Queue()
+        self._pool = None
+        
+        # The setup worker process reports through its own queue, and the Cancel
+        # button stops its pip and build commands through the event. Both are
+        # made by the first setup, since multiprocessing's queue and event bring
+        # in subprocess and friends, which a launch that only runs the
+        # translator never needs
+        self._setup_queue = None
+        self._cancel_event = None
+        
+        # The translator module is imported on the first run and reused after that
+        self._translator_module = None
+        
+        # Only the most recent lines are kept in the status text
+        self._log_ring = collections.deque(maxlen=500)
+        
         self.setup_ui()
-        self.check_environment()
+        self.root.after(50, self._drain_log)
+        
+        # Probe in the background so the window shows up immediately
+        threading.Thread(target=self._check_env_worker, daemon=True).start()
         
     def setup_ui(self):
         # Main frame
@@ -55,6 +414,10 @@ class GameTranslatorLauncher:
                                  command=self.run_translator, state=tk.DISABLED)
         self.run_btn.pack(side=tk.LEFT, padx=(0, 10))
         
+        self.cancel_btn = ttk.Button(button_frame, text="Cancel", 
+                                    command=self._cancel_setup, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
         self.exit_btn = ttk.Button(button_frame, text="Exit", 
                                   command=self.root.quit)
         self.exit_btn.pack(side=tk.RIGHT)
@@ -80,15 +443,68 @@ The program will work even if the C++ module can't be built - it will use pure P
         info_label.pack(fill=tk.X)
         
     def log_message(self, message):
-        """Add a message to the status text"""
-        self.status_text.config(state=tk.NORMAL)
-        self.status_text.insert(tk.END, message + "\n")
-        self.status_text.see(tk.END)
-        self.status_text.config(state=tk.DISABLED)
-        self.root.update()
-        
-    def check_environment(self):
-        """Check the current environment and enable appropriate buttons"""
+        """Queue a message for the status text (safe to call from any thread)"""
+        self.log_queue.put(("log", message))
+        
+    def _drain_log(self):
+        """Move queued log messages into the status text in one batch"""
+        # Report the environment probe first, so its lines go into this batch
+        try:
+            self.check_environment(self.env_queue.get_nowait())
+        except queue.Empty:
+            pass
+            
+        batch = []
+        for source in (self.log_queue, self._setup_queue):
+            if source is None:
+                continue
+            try:
+                while len(batch) < 64:
+                    kind, payload = source.get_nowait()
+                    if kind == "progress":
+                        self.progress_var.set(payload)
+                    else:
+                        batch.append(payload)
+            except queue.Empty:
+                pass
+            
+        if batch:
+            # Follow new output unless the user scrolled up to read something
+            first, last = self.status_text.yview()
+            self._log_ring.extend(batch)
+            
+            self.status_text.config(state=tk.NORMAL)
+            self.status_text.delete("1.0", tk.END)
+            self.status_text.insert("1.0", "\n".join(self._log_ring) + "\n")
+            if last >= 1.0:
+                self.status_text.see(tk.END)
+            else:
+                self.status_text.yview_moveto(first)
+            self.status_text.config(state=tk.DISABLED)
+            
+        self.root.after(50, self._drain_log)
+        
+    def _check_env_worker(self):
+        """Run the (possibly slow) environment probes off the Tk thread"""
+        result = {"cached": False, "found": []}
+        
+        # Skip the import probes if nothing changed since the last good setup
+        fingerprint = _env_fingerprint()
+        state = _load_state()
+        if fingerprint and state.get("fingerprint") == fingerprint and state.get("ok"):
+            result["cached"] = True
+        else:
+            # find_spec only locates the modules, so nothing (in particular the
+            # native extension) gets loaded just to answer yes/no. Each probe
+            # records the first of its modules that is available, or None
+            for modules, _, _, _ in PROBES:
+                result["found"].append(next(
+                    (name for name in modules if importlib.util.find_spec(name) is not None), None))
+                
+        self.env_queue.put(result)
+        
+    def check_environment(self, result):
+        """Report the environment probe results and enable appropriate buttons"""
         self.log_message("Checking environment...")
         
         # Check Python version
@@ -99,36 +515,25 @@ The program will work even if the C++ module can't be built - it will use pure P
             self.log_message("ERROR: Python 3.6 or higher is required!")
             return
             
-        # Check if required packages are available
-        try:
-            import tkinter
-            self.log_message("✓ tkinter is available")
-        except ImportError:
-            self.log_message("ERROR: tkinter is not available!")
+        if result["cached"]:
+            self.log_message("✓ Environment unchanged since last setup - ready!")
+            self.setup_btn.config(state=tk.NORMAL)
+            self.run_btn.config(state=tk.NORMAL)
             return
             
-        # Check if pybind11 is available
-        try:
-            import pybind11
-            self.log_message("✓ pybind11 is available")
-            pybind11_available = True
-        except ImportError:
-            self.log_message("⚠ pybind11 not found - will install it")
-            pybind11_available = False
-            
-        # Check if C++ module is already built
-        try:
-            import text_extractor
-            self.log_message("✓ C++ optimization module is available")
-            cpp_available = True
-        except ImportError:
-            self.log_message("⚠ C++ module not found - will try to build it")
-            cpp_available = False
-            
+        # Report each probe; a missing required module stops here
+        for (_, required, label, missing_message), found in zip(PROBES, result["found"]):
+            if found is not None:
+                self.log_message(f"✓ {label or found} is available")
+            else:
+                self.log_message(missing_message)
+                if required:
+                    return
+                    
         # Enable setup button
         self.setup_btn.config(state=tk.NORMAL)
         
-        if pybind11_available and cpp_available:
+        if all(found is not None for found in result["found"]):
             self.log_message("✓ Environment is ready!")
             self.run_btn.config(state=tk.NORMAL)
         else:
@@ -136,85 +541,75 @@ The program will work even if the C++ module can't be built - it will use pure P
             
     def setup_environment(self):
         """Setup the environment by installing dependencies and building modules"""
+        # Never start a second setup while one is still running
+        if self._pool is not None:
+            return
+            
         self.setup_btn.config(state=tk.DISABLED)
         self.run_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        if self._cancel_event is None:
+            self._setup_queue = _MP_CONTEXT.Queue()
+            self._cancel_event = _MP_CONTEXT.Event()
+        self._cancel_event.clear()
+        self.log_message("\n=== Starting Setup ===")
         
-        # Run setup in a separate thread
-        thread = threading.Thread(target=self.setup_thread)
-        thread.daemon = True
-        thread.start()
+        import concurrent.futures
+        
+        # Run setup in a child process so a crashing build can't take down the launcher
+        self._pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=1, mp_context=_MP_CONTEXT, 
+            initializer=_init_setup_worker, initargs=(self._setup_queue, self._cancel_event))
+        future = self._pool.submit(_run_setup_in_subproc)
+        future.add_done_callback(lambda f: self.root.after(0, self._on_setup_done, f))
+        
+    def _cancel_setup(self):
+        """Ask the setup worker to stop its running command"""
+        self.cancel_btn.config(state=tk.DISABLED)
+        self.log_message("Cancelling setup...")
+        self._cancel_event.set()
+        
+    def _on_setup_done(self, future):
+        """Finish the setup on the Tk thread once the worker process is done"""
+        self._pool.shutdown(wait=False)
+        self._pool = None
+        self.cancel_btn.config(state=tk.DISABLED)
         
-    def setup_thread(self):
-        """Setup thread that runs the actual installation"""
         try:
-            self.log_message("\n=== Starting Setup ===")
-            
-            # Install requirements
-            self.log_message("Installing requirements...")
-            self.progress_var.set(20)
-            
-            try:
-                result = subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"], 
-                                      capture_output=True, text=True, timeout=300)
-                if result.returncode == 0:
-                    self.log_message("✓ Requirements installed successfully")
-                else:
-                    self.log_message(f"⚠ Warning installing requirements: {result.stderr}")
-            except subprocess.TimeoutExpired:
-                self.log_message("⚠ Timeout installing requirements - continuing anyway")
-            except Exception as e:
-                self.log_message(f"⚠ Error installing requirements: {e}")
-                
-            self.progress_var.set(50)
-            
-            # Try to build C++ module
-            self.log_message("Building C++ optimization module...")
-            try:
-                result = subprocess.run([sys.executable, "setup.py", "build_ext", "--inplace"], 
-                                      capture_output=True, text=True, timeout=300)
-                if result.returncode == 0:
-                    self.log_message("✓ C++ module built successfully")
-                else:
-                    self.log_message(f"⚠ C++ module build failed: {result.stderr}")
-                    self.log_message("Program will use Python-only mode")
-            except subprocess.TimeoutExpired:
-                self.log_message("⚠ Timeout building C++ module - using Python mode")
-            except Exception as e:
-                self.log_message(f"⚠ Error building C++ module: {e}")
-                self.log_message("Program will use Python-only mode")
-                
-            self.progress_var.set(100)
-            
-            # Check final status
-            try:
-                import text_extractor
-                self.log_message("✓ C++ optimization module is working!")
-                cpp_working = True
-            except ImportError:
-                self.log_message("✓ Using Python-only mode (still fast!)")
-                cpp_working = False
-                
-            self.log_message("\n=== Setup Complete ===")
-            self.log_message("You can now run the Game Text Translator!")
-            
-            # Enable run button
-            self.run_btn.config(state=tk.NORMAL)
-            self.setup_btn.config(state=tk.NORMAL)
-            
+            status = future.result()
         except Exception as e:
             self.log_message(f"ERROR during setup: {e}")
             self.setup_btn.config(state=tk.NORMAL)
+            return
+            
+        if status.get("cancelled"):
+            self.setup_btn.config(state=tk.NORMAL)
+            return
+            
+        # Make the freshly built module importable from this process too
+        importlib.invalidate_caches()
+        
+        # Remember a fully working setup so the next launch can skip it
+        _save_state({"fingerprint": _env_fingerprint(),
+                     "ok": status["requirements_ok"] and status["cpp_working"]})
+        
+        # Enable run button
+        self.run_btn.config(state=tk.NORMAL)
+        self.setup_btn.config(state=tk.NORMAL)
             
     def run_translator(self):
         """Run the main translator program"""
         try:
             self.log_message("Starting Game Text Translator...")
             
-            # Import and run the main program
-            import game_translator
-            game_translator.main()
+            # Import the main program once, then just open a new window on each click
+            if self._translator_module is None:
+                import game_translator
+                self._translator_module = game_translator
+            self._translator_module.main()
             
         except Exception as e:
+            from tkinter import messagebox
             messagebox.showerror("Error", f"Failed to start translator: {e}")
             self.log_message(f"Error: {e}")
             
@@ -1,31 +1,157 @@
 #!/usr/bin/env python3
 """
 Setup script for Game Text Translator
-Builds the C++ extension module using pybind11
+Builds the C++ extension module using nanobind (or pybind11 if nanobind is missing)
 """
 
 from setuptools import setup, Extension
-from pybind11.setup_helpers import Pybind11Extension, build_ext
-from pybind11 import get_cmake_dir
-import pybind11
+from setuptools.command.build_ext import build_ext
+try:
+    from setuptools.errors import CompileError, LinkError
+except ImportError:  # setuptools < 59 has no errors module
+    from distutils.errors import CompileError, LinkError
+from pathlib import Path
+import platform
+import tempfile
 import sys
 import os
+import subprocess
 
 # Define the C++ extension
-ext_modules = [
-    Pybind11Extension(
-        "text_extractor",
-        [
-            "text_extractor.cpp",
-        ],
-        include_dirs=[
-            # Path to pybind11 headers
-            pybind11.get_include(),
-        ],
-        language='c++',
-        cxx_std=17,
-    ),
-]
+try:
+    import nanobind
+    
+    nanobind_root = os.path.dirname(nanobind.__file__)
+    if sys.platform == "win32":
+        nanobind_args = ["/std:c++17", "/bigobj"]
+    else:
+        nanobind_args = ["-std=c++17"]
+    
+    ext_modules = [
+        Extension(
+            "text_extractor",
+            [
+                "text_extractor.cpp",
+                # nanobind is compiled into the extension rather than linked
+                os.path.join(nanobind.source_dir(), "nb_combined.cpp"),
+            ],
+            include_dirs=[
+                # Path to nanobind headers and its bundled hash map
+                nanobind.include_dir(),
+                os.path.join(nanobind_root, "ext", "robin_map", "include"),
+            ],
+            define_macros=[("TEXT_EXTRACTOR_NANOBIND", None)],
+            extra_compile_args=nanobind_args,
+            language='c++',
+        ),
+    ]
+except ImportError:
+    from pybind11.setup_helpers import Pybind11Extension, build_ext
+    import pybind11
+    
+    ext_modules = [
+        Pybind11Extension(
+            "text_extractor",
+            [
+                "text_extractor.cpp",
+            ],
+            include_dirs=[
+                # Path to pybind11 headers
+                pybind11.get_include(),
+            ],
+            language='c++',
+            cxx_std=17,
+        ),
+    ]
+
+# Exits with 0 only on a CPU (and OS) that runs everything -march=x86-64-v3 and
+# /arch:AVX2 may emit: AVX2, FMA, BMI1/2 and saved AVX registers
+_AVX2_PROBE = r"""
+#ifdef _MSC_VER
+#include <intrin.h>
+int main() {
+    int info[4];
+    __cpuid(info, 0);
+    if (info[0] < 7) return 1;
+    __cpuid(info, 1);
+    const int fma = 1 << 12, osxsave = 1 << 27, avx = 1 << 28;
+    if ((info[2] & (fma | osxsave | avx)) != (fma | osxsave | avx)) return 1;
+    if ((_xgetbv(0) & 6) != 6) return 1;
+    __cpuidex(info, 7, 0);
+    const int bmi1 = 1 << 3, avx2 = 1 << 5, bmi2 = 1 << 8;
+    return (info[1] & (bmi1 | avx2 | bmi2)) == (bmi1 | avx2 | bmi2) ? 0 : 1;
+}
+#else
+int main() {
+    __builtin_cpu_init();
+    return __builtin_cpu_supports("avx2") && __builtin_cpu_supports("fma")
+        && __builtin_cpu_supports("bmi") && __builtin_cpu_supports("bmi2") ? 0 : 1;
+}
+#endif
+"""
+
+class optimized_build_ext(build_ext):
+    """build_ext that adds optimization flags for the compiler in use"""
+    
+    def build_extensions(self):
+        x86_64 = platform.machine().lower() in ("x86_64", "amd64")
+        if self.compiler.compiler_type == "msvc":
+            compile_args = ["/O2", "/GL", "/DNDEBUG"]
+            link_args = ["/LTCG"]
+            if x86_64 and self.host_has_avx2():
+                compile_args.append("/arch:AVX2")
+        else:
+            compile_args = ["-O3", "-flto", "-fvisibility=hidden", "-funroll-loops"]
+            link_args = ["-flto"]
+            
+            # Tuning for the build machine itself must be asked for with
+            # PORTABLE_BUILD=0; otherwise target any AVX2-capable x86-64 CPU,
+            # but only when the build machine is one. The compiler accepting the
+            # flag says nothing about the CPU, and a module built for AVX2 raises
+            # SIGILL on a CPU without it, taking the whole program down
+            if os.environ.get("PORTABLE_BUILD", "1") == "0":
+                arch = "-march=native"
+            else:
+                arch = "-march=x86-64-v3" if x86_64 and self.host_has_avx2() else None
+            if arch and self.has_flag(arch):
+                compile_args.append(arch)
+                
+        for ext in self.extensions:
+            ext.extra_compile_args = ext.extra_compile_args + compile_args
+            ext.extra_link_args = ext.extra_link_args + link_args
+        super().build_extensions()
+        
+    def has_flag(self, flag):
+        """Check whether the compiler accepts a flag (older compilers lack x86-64-v3)"""
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "flagcheck.cpp")
+            with open(source, "w") as f:
+                f.write("int main() { return 0; }\n")
+            try:
+                self.compiler.compile([source], output_dir=tmp, extra_postargs=[flag])
+            except CompileError:
+                return False
+        return True
+        
+    def host_has_avx2(self):
+        """Check whether the build machine can run AVX2 code, by building and running a probe"""
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "avx2check.cpp")
+            with open(source, "w") as f:
+                f.write(_AVX2_PROBE)
+            try:
+                objects = self.compiler.compile([source], output_dir=tmp)
+                self.compiler.link_executable(objects, "avx2check", output_dir=tmp)
+                probe = os.path.join(tmp, self.compiler.executable_filename("avx2check"))
+                return subprocess.run([probe], timeout=30).returncode == 0
+            except (CompileError, LinkError, OSError, subprocess.SubprocessError):
+                # Includes cross builds, whose probe cannot run here
+                return False
+
+def _long_desc():
+    """README contents, read relative to this file and always as UTF-8"""
+    readme = Path(__file__).with_name("README.md")
+    return readme.read_text(encoding="utf-8") if readme.exists() else ""
 
 # Define the package
 setup(
@@ -33,14 +159,15 @@ setup(
     version="1.0.0",
     author="Game Translator Team",
     description="Fast text extraction and translation tool for game localization",
-    long_description=open("README.md").read() if os.path.exists("README.md") else "",
+    long_description=_long_desc(),
     long_description_content_type="text/markdown",
     ext_modules=ext_modules,
-    cmdclass={"build_ext": build_ext},
+    cmdclass={"build_ext": optimized_build_ext},
     zip_safe=False,
     python_requires=">=3.6",
     install_requires=[
-        "pybind11>=2.6.0",
+        "nanobind>=1.0.0; python_version >= '3.8'",
+        "pybind11>=2.6.0; python_version < '3.8'",
         "tkinter",  # Usually included with Python
     ],
     classifiers=[
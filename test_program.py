@@ -12,44 +12,99 @@ import tkinter as tk
 from tkinter import ttk
 import time
 import json
+import hashlib
+import argparse
+import io
+import contextlib
+import multiprocessing
+import concurrent.futures
 
 # Add current directory to path to import the main module
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 try:
-    from game_translator import GameTranslator
-    print("✓ Successfully imported GameTranslator")
+    from game_translator import (GameTranslator, ExtractedTexts, write_translation_file, read_translation_file,
+                                 CPP_AVAILABLE)
+    # Test worker processes import this module too; only report once
+    if multiprocessing.current_process().name == "MainProcess":
+        print("✓ Successfully imported GameTranslator")
 except ImportError as e:
     print(f"✗ Failed to import GameTranslator: {e}")
     sys.exit(1)
 
+# The generated test files are kept here between runs unless --no-cache is given;
+# it sits in the user's own cache directory, next to the launcher's, so nobody
+# else on the machine can plant or remove files in it
+CORPUS_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "game_translator", "test_corpus")
+
+def _fast_rmtree(path):
+    """Delete a directory tree using the entry types scandir already knows"""
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    _fast_rmtree(entry.path)
+                else:
+                    os.unlink(entry.path)
+        os.rmdir(path)
+    except OSError:
+        # e.g. permissions; shutil knows how to deal with the odd cases
+        shutil.rmtree(path)
+
+def _run_test_in_worker(test_name, test_dir, output_dir):
+    """Run one headless test in a worker process; returns its output and counts"""
+    tester = ProgramTester()
+    tester.test_dir = test_dir
+    tester.output_dir = output_dir
+    tester.headless_translator = GameTranslator(headless=True)
+    tester.default_extensions = tester.headless_translator.extensions_var.get()
+    
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        tester._timed(getattr(tester, test_name))
+    tester.headless_translator.close()
+    return output.getvalue(), tester.passed_tests, tester.total_tests, tester.timings[test_name]
+
 class ProgramTester:
-    def __init__(self):
+    # Tests that only use the headless translator; with --parallel they run in
+    # worker processes while the Tk tests run here, since Tk must stay on the
+    # main process
+    PARALLEL_TESTS = ("test_extension_parsing", "test_preset_functionality",
+                      "test_text_chunking", "test_error_handling")
+    
+    def __init__(self, use_cache=True):
+        self.use_cache = use_cache
         self.test_dir = None
         self.output_dir = None
+        self.root = None
+        self.translator = None
+        self.headless_translator = None
         self.passed_tests = 0
         self.total_tests = 0
+        self.timings = {}
+        
+        # Results are collected here and written out once per test
+        self._log_buf = io.StringIO()
         
     def log_test(self, test_name, passed, message=""):
         """Log test results"""
         self.total_tests += 1
         if passed:
             self.passed_tests += 1
-            print(f"✓ {test_name}: PASSED {message}")
+            self._log_buf.write(f"✓ {test_name}: PASSED {message}\n")
         else:
-            print(f"✗ {test_name}: FAILED {message}")
+            self._log_buf.write(f"✗ {test_name}: FAILED {message}\n")
+            
+    def _flush_log(self):
+        """Write the buffered results in one go"""
+        sys.stdout.write(self._log_buf.getvalue())
+        self._log_buf.seek(0)
+        self._log_buf.truncate()
     
     def setup_test_environment(self):
         """Create test files and directories"""
         print("\n=== Setting up test environment ===")
         
-        # Create temporary directories
-        self.test_dir = tempfile.mkdtemp(prefix="game_translator_test_")
-        self.output_dir = tempfile.mkdtemp(prefix="game_translator_output_")
-        
-        print(f"Test directory: {self.test_dir}")
-        print(f"Output directory: {self.output_dir}")
-        
         # Create test files with different extensions
         test_files = {
             "test.csv": 'name,description,value\n"Player Name","Enter your name","Default Player"\n"Score","Your current score","0"',
@@ -60,24 +115,84 @@ class ProgramTester:
             "test.xml": '<game><title>Test Game</title><description>A test game for validation</description></game>',
             "test.json": '{"title": "Game Config", "messages": {"welcome": "Welcome to our game!", "goodbye": "Thanks for playing!"}}',
             "large_text.csv": f'id,text\n1,"{"A" * 25000}"\n2,"{"B" * 30000}"',  # Test large text handling
+            "dialogue.erb": 'don\'t say "hello there" it\'s fine\n<text>Press "Start" now</text>',  # Quotes inside other matches
+            "menu.csv": '"Start Game","Options"\n"Start Game","Quit Game"',  # Repeated texts
+            "menu.js": 'const startLabel = "Start Game";',
         }
         
-        for filename, content in test_files.items():
-            filepath = os.path.join(self.test_dir, filename)
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
+        # The output directory is always fresh; the test files are only written
+        # again when the recipe above has changed since they were cached
+        self.output_dir = tempfile.mkdtemp(prefix="game_translator_output_")
+        recipe_hash = hashlib.blake2b(json.dumps(test_files, sort_keys=True).encode('utf-8')).hexdigest()
+        recipe_file = os.path.join(CORPUS_CACHE_DIR, ".recipe")
+        
+        if self.use_cache:
+            self.test_dir = CORPUS_CACHE_DIR
+            try:
+                with open(recipe_file, 'r', encoding='utf-8') as f:
+                    cached = f.read() == recipe_hash
+                    
+                # The recipe only says what was written; a file deleted or
+                # edited since then must not pass as cached
+                cached = cached and all(
+                    os.path.getsize(os.path.join(self.test_dir, filename)) == len(content.encode('utf-8'))
+                    for filename, content in test_files.items())
+            except OSError:
+                cached = False
+        else:
+            self.test_dir = tempfile.mkdtemp(prefix="game_translator_test_")
+            cached = False
+            
+        print(f"Test directory: {self.test_dir}")
+        print(f"Output directory: {self.output_dir}")
+        
+        if cached:
+            print(f"Reusing {len(test_files)} cached test files")
+        else:
+            if self.use_cache:
+                shutil.rmtree(self.test_dir, ignore_errors=True)
+                os.makedirs(self.test_dir)
+                
+            # Written without newline translation, so the sizes checked above
+            # are the same on every platform
+            for filename, content in test_files.items():
+                filepath = os.path.join(self.test_dir, filename)
+                with open(filepath, 'w', encoding='utf-8', newline='') as f:
+                    f.write(content)
+                    
+            # Written last, so an interrupted run is regenerated next time
+            if self.use_cache:
+                with open(recipe_file, 'w', encoding='utf-8') as f:
+                    f.write(recipe_hash)
+            
+            print(f"Created {len(test_files)} test files")
+        
+        # One hidden Tk root and translator serve every test; starting Tk is the
+        # slowest part of a test, so it is only done once
+        self.root = tk.Tk()
+        self.root.withdraw()
+        self.translator = GameTranslator(self.root)
+        self.default_extensions = self.translator.extensions_var.get()
+        
+        # Tests that never touch a widget use a translator without any UI
+        self.headless_translator = GameTranslator(headless=True)
         
-        print(f"Created {len(test_files)} test files")
+    def _reset_translator(self, headless=False):
+        """Return a shared translator with the state left by earlier tests cleared"""
+        translator = self.headless_translator if headless else self.translator
+        translator.extracted_texts = ExtractedTexts()
+        translator.translations = {}
+        translator.current_directory = ""
+        translator.output_directory = ""
+        translator.extensions_var.set(self.default_extensions)
+        return translator
         
     def test_ui_initialization(self):
         """Test UI initialization"""
         print("\n=== Testing UI Initialization ===")
         
         try:
-            root = tk.Tk()
-            root.withdraw()  # Hide window during testing
-            
-            translator = GameTranslator(root)
+            translator = self._reset_translator()
             
             # Test if all required attributes exist
             required_attrs = ['extracted_texts', 'translations', 'current_directory', 
@@ -95,7 +210,16 @@ class ProgramTester:
             self.log_test("Default Extensions", default_extensions == expected_default, 
                          f"Got: {default_extensions}, Expected: {expected_default}")
             
-            root.destroy()
+            # Test that a headless translator starts from the same state
+            headless = GameTranslator(headless=True)
+            headless_extensions = headless.extensions_var.get()
+            self.log_test("Headless Default Extensions", headless_extensions == default_extensions,
+                         f"Got: {headless_extensions}, Expected: {default_extensions}")
+            
+            # Test that a headless translator can release its event loop
+            headless.close()
+            self.log_test("Headless Close", headless.loop.is_closed(),
+                         f"Loop closed: {headless.loop.is_closed()}")
             
         except Exception as e:
             self.log_test("UI Initialization", False, f"Exception: {e}")
@@ -105,9 +229,7 @@ class ProgramTester:
         print("\n=== Testing Extension Parsing ===")
         
         try:
-            root = tk.Tk()
-            root.withdraw()
-            translator = GameTranslator(root)
+            translator = self._reset_translator(headless=True)
             
             # Test default extensions
             extensions = translator.get_file_extensions()
@@ -136,8 +258,6 @@ class ProgramTester:
             self.log_test("Case Insensitive Extensions", extensions == expected,
                          f"Got: {extensions}, Expected: {expected}")
             
-            root.destroy()
-            
         except Exception as e:
             self.log_test("Extension Parsing", False, f"Exception: {e}")
     
@@ -146,9 +266,7 @@ class ProgramTester:
         print("\n=== Testing Extension Presets ===")
         
         try:
-            root = tk.Tk()
-            root.withdraw()
-            translator = GameTranslator(root)
+            translator = self._reset_translator(headless=True)
             
             # Test code preset
             translator.set_extension_preset("code")
@@ -168,7 +286,11 @@ class ProgramTester:
             self.log_test("All Preset", len(extensions.split(',')) > 10,
                          f"All preset has {len(extensions.split(','))} extensions")
             
-            root.destroy()
+            # Test that the all preset includes every other preset
+            all_extensions = set(extensions.split(','))
+            covered = all(set(GameTranslator._PRESETS[name].split(',')) <= all_extensions for name in ("code", "web"))
+            self.log_test("All Preset Covers Others", covered,
+                         f"Code and web extensions included: {covered}")
             
         except Exception as e:
             self.log_test("Extension Presets", False, f"Exception: {e}")
@@ -178,9 +300,7 @@ class ProgramTester:
         print("\n=== Testing File Processing ===")
         
         try:
-            root = tk.Tk()
-            root.withdraw()
-            translator = GameTranslator(root)
+            translator = self._reset_translator()
             
             # Set test directories
             translator.current_directory = self.test_dir
@@ -203,16 +323,48 @@ class ProgramTester:
                          f"Found {all_extensions_count} texts from multiple extensions")
             
             # Test large text handling
-            large_texts = [text for text in translator.extracted_texts if len(text['text']) > 10000]
+            large_texts = translator.extracted_texts.texts_over(10000)
             self.log_test("Large Text Detection", len(large_texts) > 0,
                          f"Found {len(large_texts)} texts larger than 10k characters")
             
+            # Test that the length index agrees with a scan of every text
+            scanned = sum(1 for text in translator.extracted_texts if len(text.text) > 10000)
+            self.log_test("Length Index", len(large_texts) == scanned and all(len(text.text) > 10000 for text in large_texts),
+                         f"Index found {len(large_texts)} texts over 10k, a full scan {scanned}")
+            
             # Test 50k character limit
-            very_large_texts = [text for text in translator.extracted_texts if len(text['text']) > 50000]
+            very_large_texts = translator.extracted_texts.texts_over(50000)
             self.log_test("50k Character Limit", len(very_large_texts) == 0,
                          f"No texts exceed 50k limit (found {len(very_large_texts)} oversized)")
             
-            root.destroy()
+            # Test that a quote inside another match does not hide a text
+            found = set(translator.extracted_texts.unique_texts)
+            overlapping = {"hello there", 't say "hello there" it', 'Press "Start" now', "Start"}
+            self.log_test("Overlapping Matches", overlapping <= found,
+                         f"{len(overlapping & found)} of {len(overlapping)} found, missing {sorted(overlapping - found)}")
+            
+            # Test that repeated texts are stored once, and that every
+            # occurrence of one points at the same text id
+            extracted = translator.extracted_texts
+            unique_texts = extracted.unique_texts
+            repeated_ids = {text_id for text_id in extracted.text_ids if unique_texts[text_id] == "Start Game"}
+            repeated_count = sum(1 for text in extracted.texts if text == "Start Game")
+            self.log_test("Text Deduplication", 
+                         len(unique_texts) < len(extracted) and repeated_count == 3 and len(repeated_ids) == 1,
+                         f"{len(unique_texts)} unique texts for {len(extracted)} occurrences, "
+                         f"\"Start Game\" {repeated_count} times under {len(repeated_ids)} id(s)")
+            
+            # Test the C++ extractor on the same files; the long strings in
+            # large_text.csv used to overflow std::regex's stack
+            if CPP_AVAILABLE:
+                translator.extracted_texts = ExtractedTexts()
+                translator.extract_texts()
+                cpp_count = len(translator.extracted_texts)
+                cpp_large = translator.extracted_texts.texts_over(10000)
+                self.log_test("C++ Extraction", cpp_count > 0 and len(cpp_large) > 0,
+                             f"Found {cpp_count} texts, {len(cpp_large)} over 10k characters")
+            else:
+                self._log_buf.write("- C++ Extraction: SKIPPED (module not built)\n")
             
         except Exception as e:
             self.log_test("File Processing", False, f"Exception: {e}")
@@ -222,9 +374,7 @@ class ProgramTester:
         print("\n=== Testing Text Chunking ===")
         
         try:
-            root = tk.Tk()
-            root.withdraw()
-            translator = GameTranslator(root)
+            translator = self._reset_translator(headless=True)
             
             # Test chunking with exactly 50k characters
             test_text = "A" * 50000
@@ -252,7 +402,9 @@ class ProgramTester:
             self.log_test("Word Boundary Splitting", no_partial_words,
                          f"No partial words in {len(chunks)} chunks")
             
-            root.destroy()
+            # Test that only the space at each break is dropped
+            self.log_test("Chunk Round Trip", " ".join(chunks) == test_text,
+                         f"{len(chunks)} chunks rejoin to the original {len(test_text)} characters")
             
         except Exception as e:
             self.log_test("Text Chunking", False, f"Exception: {e}")
@@ -262,9 +414,7 @@ class ProgramTester:
         print("\n=== Testing Translation Management ===")
         
         try:
-            root = tk.Tk()
-            root.withdraw()
-            translator = GameTranslator(root)
+            translator = self._reset_translator()
             
             # Add some test translations
             test_translations = {
@@ -278,27 +428,23 @@ class ProgramTester:
             self.log_test("Translation Storage", len(translator.translations) == 3,
                          f"Stored {len(translator.translations)} translations")
             
-            # Test translation file save (simulate)
+            # Test translation file save (the same code the Save button uses)
             translation_file = os.path.join(self.output_dir, "test_translations.json")
             try:
-                with open(translation_file, 'w', encoding='utf-8') as f:
-                    json.dump(translator.translations, f, ensure_ascii=False, indent=2)
+                write_translation_file(translation_file, translator.translations)
                 self.log_test("Translation File Save", os.path.exists(translation_file),
                              "Translation file created successfully")
             except Exception as e:
                 self.log_test("Translation File Save", False, f"Save failed: {e}")
             
-            # Test translation file load (simulate)
+            # Test translation file load
             try:
-                with open(translation_file, 'r', encoding='utf-8') as f:
-                    loaded_translations = json.load(f)
+                loaded_translations = read_translation_file(translation_file)
                 self.log_test("Translation File Load", loaded_translations == test_translations,
                              "Translations loaded correctly")
             except Exception as e:
                 self.log_test("Translation File Load", False, f"Load failed: {e}")
             
-            root.destroy()
-            
         except Exception as e:
             self.log_test("Translation Management", False, f"Exception: {e}")
     
@@ -307,9 +453,7 @@ class ProgramTester:
         print("\n=== Testing Error Handling ===")
         
         try:
-            root = tk.Tk()
-            root.withdraw()
-            translator = GameTranslator(root)
+            translator = self._reset_translator(headless=True)
             
             # Test empty extensions
             translator.extensions_var.set("")
@@ -334,7 +478,17 @@ class ProgramTester:
             self.log_test("Long Extension List", len(extensions) == 100,
                          f"Handled {len(extensions)} extensions")
             
-            root.destroy()
+            # Test extraction speed when every file is checked against many extensions
+            translator.extensions_var.set(".csv")
+            translator.current_directory = self.test_dir
+            translator.extract_texts_python()
+            csv_count = len(translator.extracted_texts)
+            translator.extensions_var.set(long_extensions + ",.csv")
+            start_time = time.time()
+            translator.extract_texts_python()
+            elapsed = time.time() - start_time
+            self.log_test("Long Extension List Extraction", len(translator.extracted_texts) == csv_count > 0,
+                         f"Found {len(translator.extracted_texts)} texts with 101 extensions in {elapsed * 1000:.1f} ms")
             
         except Exception as e:
             self.log_test("Error Handling", False, f"Exception: {e}")
@@ -344,18 +498,55 @@ class ProgramTester:
         print("\n=== Cleaning up test environment ===")
         
         try:
-            if self.test_dir and os.path.exists(self.test_dir):
-                shutil.rmtree(self.test_dir)
+            # Destroying the window closes its translator's loop; the headless
+            # one has no window
+            if self.headless_translator is not None:
+                self.headless_translator.close()
+            if self.root is not None:
+                self.root.destroy()
+                
+            if self.test_dir and os.path.exists(self.test_dir) and not self.use_cache:
+                _fast_rmtree(self.test_dir)
                 print(f"Cleaned up test directory: {self.test_dir}")
             
             if self.output_dir and os.path.exists(self.output_dir):
-                shutil.rmtree(self.output_dir)
+                _fast_rmtree(self.output_dir)
                 print(f"Cleaned up output directory: {self.output_dir}")
                 
         except Exception as e:
             print(f"Warning: Could not clean up test directories: {e}")
     
-    def run_all_tests(self):
+    def _timed(self, test):
+        """Run one test method and record how long it took, in seconds"""
+        start = time.perf_counter_ns()
+        try:
+            test()
+        finally:
+            self.timings[test.__name__] = (time.perf_counter_ns() - start) / 1e9
+            self._flush_log()
+        
+    def _run_tests_parallel(self, tests):
+        """Run the headless tests in worker processes and the rest here"""
+        worker_tests = [test for test in tests if test.__name__ in self.PARALLEL_TESTS]
+        max_workers = min(len(worker_tests), os.cpu_count() or 1)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers,
+                                                    mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [pool.submit(_run_test_in_worker, test.__name__, self.test_dir, self.output_dir)
+                       for test in worker_tests]
+            
+            for test in tests:
+                if test.__name__ not in self.PARALLEL_TESTS:
+                    self._timed(test)
+                    
+            # Worker output is printed afterwards, in test order
+            for test, future in zip(worker_tests, futures):
+                output, passed, total, elapsed = future.result()
+                print(output, end="")
+                self.passed_tests += passed
+                self.total_tests += total
+                self.timings[test.__name__] = elapsed
+                
+    def run_all_tests(self, parallel=False):
         """Run all tests"""
         print("Game Text Translator - Comprehensive Test Suite")
         print("=" * 60)
@@ -364,13 +555,20 @@ class ProgramTester:
         
         try:
             self.setup_test_environment()
-            self.test_ui_initialization()
-            self.test_extension_parsing()
-            self.test_preset_functionality()
-            self.test_file_processing()
-            self.test_text_chunking()
-            self.test_translation_management()
-            self.test_error_handling()
+            tests = [
+                self.test_ui_initialization,
+                self.test_extension_parsing,
+                self.test_preset_functionality,
+                self.test_file_processing,
+                self.test_text_chunking,
+                self.test_translation_management,
+                self.test_error_handling,
+            ]
+            if parallel:
+                self._run_tests_parallel(tests)
+            else:
+                for test in tests:
+                    self._timed(test)
             
         except Exception as e:
             print(f"\n✗ CRITICAL ERROR: {e}")
@@ -390,6 +588,12 @@ class ProgramTester:
         print(f"Success Rate: {(self.passed_tests/self.total_tests)*100:.1f}%")
         print(f"Test Duration: {duration:.2f} seconds")
         
+        # The slowest tests are where speeding up the suite should start
+        if self.timings:
+            print("Slowest Tests:")
+            for name, elapsed in sorted(self.timings.items(), key=lambda item: item[1], reverse=True)[:3]:
+                print(f"  {name}: {elapsed * 1000:.2f} ms")
+        
         if self.passed_tests == self.total_tests:
             print("\n🎉 ALL TESTS PASSED! The program works perfectly!")
             return True
@@ -400,8 +604,17 @@ class ProgramTester:
 
 def main():
     """Main test function"""
-    tester = ProgramTester()
-    success = tester.run_all_tests()
+    parser = argparse.ArgumentParser(description="Test the Game Text Translator")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="generate the test files in a new directory and delete them afterwards")
+    parser.add_argument("--parallel", action="store_true",
+                        help="run the tests that don't need Tk in worker processes; starting "
+                             "the workers costs more than today's tests take, so this only "
+                             "pays off once those tests get expensive")
+    args = parser.parse_args()
+    
+    tester = ProgramTester(use_cache=not args.no_cache)
+    success = tester.run_all_tests(parallel=args.parallel)
     
     if success:
         print("\n✅ PROGRAM VALIDATION: PASSED")
@@ -1,42 +1,247 @@
+#ifdef TEXT_EXTRACTOR_NANOBIND
+#include <nanobind/nanobind.h>
+#include <nanobind/stl/string.h>
+#include <nanobind/stl/vector.h>
+#else
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
-#include <pybind11/numpy.h>
+#endif
 #include <filesystem>
 #include <fstream>
 #include <string>
+#include <string_view>
 #include <vector>
+#include <memory>
+#include <cstring>
 #include <regex>
 #include <unordered_map>
 #include <chrono>
 #include <iostream>
 #include <algorithm>
+#include <cstdint>
+#include <cstdlib>
+#ifdef __AVX2__
+#include <immintrin.h>
+#ifdef _MSC_VER
+#include <intrin.h>
+#endif
+#endif
 
+#ifdef TEXT_EXTRACTOR_NANOBIND
+namespace nb = nanobind;
+#else
 namespace py = pybind11;
+#endif
 namespace fs = std::filesystem;
 
+// Position of the first '"', '\'' or '<' in p[0..n), or n if there is none.
+// Every pattern needs one of these, so lines without any can skip the scanners
+static size_t find_delim(const char* p, size_t n) {
+    size_t i = 0;
+#ifdef __AVX2__
+    const __m256i dq = _mm256_set1_epi8('"');
+    const __m256i sq = _mm256_set1_epi8('\'');
+    const __m256i lt = _mm256_set1_epi8('<');
+    for (; i + 32 <= n; i += 32) {
+        __m256i v = _mm256_loadu_si256(reinterpret_cast<const __m256i*>(p + i));
+        __m256i m = _mm256_or_si256(_mm256_or_si256(_mm256_cmpeq_epi8(v, dq), _mm256_cmpeq_epi8(v, sq)), 
+                                    _mm256_cmpeq_epi8(v, lt));
+        uint32_t bits = static_cast<uint32_t>(_mm256_movemask_epi8(m));
+        if (bits) {
+            unsigned long index;
+#ifdef _MSC_VER
+            _BitScanForward(&index, bits);
+#else
+            index = __builtin_ctz(bits);
+#endif
+            return i + index;
+        }
+    }
+#endif
+    for (; i < n; i++) {
+        if (p[i] == '"' || p[i] == '\'' || p[i] == '<') {
+            return i;
+        }
+    }
+    return n;
+}
+
+// A match in a line: the whole match and the text inside it, as offsets
+struct Match {
+    size_t start;
+    size_t length;
+    size_t text_start;
+    size_t text_length;
+};
+
+// The patterns below are scanned by hand rather than with std::regex: libstdc++
+// recurses once per character of a repeat, so a long string overflowed the
+// stack and took the whole process down. Each scanner finds the same matches,
+// left to right, as the regex in its comment, in time linear in the line
+
+// "([^"\\]*(\\.[^"\\]*)*)" or its single-quoted twin, from offset from on
+static bool find_quoted(std::string_view line, char quote, size_t from, Match& match) {
+    const char* p = line.data();
+    size_t n = line.size();
+    size_t open = from;
+    while (true) {
+        open += find_delim(p + open, n - open);
+        if (open >= n) {
+            return false;
+        }
+        if (p[open] != quote) {
+            open++;
+            continue;
+        }
+        
+        // Every quote a failed scan passes over is escaped, and a scan from one
+        // of those would walk the same characters and fail the same way, so
+        // the search goes on from where the scan stopped
+        size_t i = open + 1;
+        for (; i < n; i++) {
+            if (p[i] == quote) {
+                match = Match{open, i + 1 - open, open + 1, i - open - 1};
+                return true;
+            }
+            if (p[i] == '\\') {
+                // An escape takes any character but a line break
+                if (i + 1 == n || p[i + 1] == '\r' || p[i + 1] == '\n') {
+                    break;
+                }
+                i++;
+            }
+        }
+        open = i + 1;
+        if (open >= n) {
+            return false;
+        }
+    }
+}
+
+static size_t skip_space(std::string_view line, size_t i) {
+    while (i < line.size() && std::isspace(static_cast<unsigned char>(line[i]))) {
+        i++;
+    }
+    return i;
+}
+
+// key\s*[:=]\s*["']([^"']+)["']
+static bool find_assignment(std::string_view line, std::string_view key, size_t from, Match& match) {
+    for (size_t pos = line.find(key, from); pos != std::string_view::npos; pos = line.find(key, pos + 1)) {
+        size_t i = skip_space(line, pos + key.size());
+        if (i == line.size() || (line[i] != ':' && line[i] != '=')) {
+            continue;
+        }
+        i = skip_space(line, i + 1);
+        if (i == line.size() || (line[i] != '"' && line[i] != '\'')) {
+            continue;
+        }
+        size_t close = line.find_first_of("\"'", i + 1);
+        if (close == std::string_view::npos) {
+            // Later keys would need a closing quote past this point too
+            return false;
+        }
+        if (close > i + 1) {
+            match = Match{pos, close + 1 - pos, i + 1, close - i - 1};
+            return true;
+        }
+    }
+    return false;
+}
+
+// <tag>([^<]+)</tag>, with open_tag and close_tag including the brackets
+static bool find_tag(std::string_view line, std::string_view open_tag, std::string_view close_tag, 
+                     size_t from, Match& match) {
+    for (size_t pos = line.find(open_tag, from); pos != std::string_view::npos; pos = line.find(open_tag, pos + 1)) {
+        size_t text_start = pos + open_tag.size();
+        size_t lt = line.find('<', text_start);
+        if (lt == std::string_view::npos) {
+            return false;
+        }
+        if (lt > text_start && line.substr(lt, close_tag.size()) == close_tag) {
+            match = Match{pos, lt + close_tag.size() - pos, text_start, lt - text_start};
+            return true;
+        }
+    }
+    return false;
+}
+
+// Bump allocator for the strings built while scanning a file. Nothing is freed
+// individually; pool_reuse() rewinds to the first block for the next file
+class Arena {
+private:
+    size_t block_size;
+    std::vector<std::unique_ptr<char[]>> blocks;
+    size_t first_block_size = 0;
+    char* cur = nullptr;
+    size_t left = 0;
+    
+    // Allocation counts, reported when TEXT_EXTRACT_TIMING=1
+    size_t allocs = 0;
+    size_t small_allocs = 0;
+    size_t hits = 0;
+    size_t bytes = 0;
+    
+public:
+    explicit Arena(size_t block_size = 4 * 1024 * 1024) : block_size(block_size) {}
+    
+    ~Arena() {
+        const char* timing = std::getenv("TEXT_EXTRACT_TIMING");
+        if (timing && std::strcmp(timing, "1") == 0) {
+            std::cerr << "Arena: " << allocs << " allocs (" << small_allocs << " under 64 bytes), "
+                      << hits << " from the current block, " << bytes << " bytes" << std::endl;
+        }
+    }
+    
+    char* alloc(size_t n) {
+        // Small strings are bump allocated too: a bump is cheaper than malloc for
+        // any size, and the pool has no free lists for them to slow down
+        allocs++;
+        small_allocs += n < 64;
+        bytes += n;
+        hits += n <= left;
+        if (n > left) {
+            size_t size = std::max(n, block_size);
+            blocks.emplace_back(new char[size]);
+            if (blocks.size() == 1) {
+                first_block_size = size;
+            }
+            cur = blocks.back().get();
+            left = size;
+        }
+        char* p = cur;
+        cur += n;
+        left -= n;
+        return p;
+    }
+    
+    std::string_view copy(std::string_view text) {
+        char* p = alloc(text.size());
+        std::memcpy(p, text.data(), text.size());
+        return std::string_view(p, text.size());
+    }
+    
+    void pool_reuse() {
+        if (blocks.empty()) {
+            return;
+        }
+        blocks.resize(1);
+        cur = blocks[0].get();
+        left = first_block_size;
+    }
+};
+
 class TextExtractor {
 private:
-    // Common text patterns in game files
-    std::vector<std::regex> text_patterns = {
-        std::regex(R"("([^"\\]*(\\.[^"\\]*)*)")"),  // Double quoted strings
-        std::regex(R"('([^'\\]*(\\.[^'\\]*)*)')"),  // Single quoted strings
-        std::regex(R"(text\s*[:=]\s*["']([^"']+)["'])"),  // text: "value"
-        std::regex(R"(label\s*[:=]\s*["']([^"']+)["'])"),  // label: "value"
-        std::regex(R"(message\s*[:=]\s*["']([^"']+)["'])"), // message: "value"
-        std::regex(R"(title\s*[:=]\s*["']([^"']+)["'])"),  // title: "value"
-        std::regex(R"(description\s*[:=]\s*["']([^"']+)["'])"), // description: "value"
-        std::regex(R"(name\s*[:=]\s*["']([^"']+)["'])"),   // name: "value"
-        std::regex(R"(value\s*[:=]\s*["']([^"']+)["'])"),  // value: "value"
-        std::regex(R"(content\s*[:=]\s*["']([^"']+)["'])"), // content: "value"
-        std::regex(R"(<text>([^<]+)</text>)"),  // XML-style text tags
-        std::regex(R"(<string>([^<]+)</string>)"), // XML string tags
-        std::regex(R"(<message>([^<]+)</message>)"), // XML message tags
-        std::regex(R"(<label>([^<]+)</label>)"), // XML label tags
-        std::regex(R"(<title>([^<]+)</title>)"), // XML title tags
-        std::regex(R"(<description>([^<]+)</description>)"), // XML description tags
-        std::regex(R"(<name>([^<]+)</name>)"), // XML name tags
-        std::regex(R"(<value>([^<]+)</value>)"), // XML value tags
-        std::regex(R"(<content>([^<]+)</content>)") // XML content tags
+    // Common text patterns in game files, besides quoted strings: keys assigned a
+    // quoted value (text: "value") and XML tags around a text
+    std::vector<std::string> text_keys = {
+        "text", "label", "message", "title", "description", "name", "value", "content"
+    };
+    std::vector<std::pair<std::string, std::string>> text_tags = {
+        {"<text>", "</text>"}, {"<string>", "</string>"}, {"<message>", "</message>"}, 
+        {"<label>", "</label>"}, {"<title>", "</title>"}, {"<description>", "</description>"}, 
+        {"<name>", "</name>"}, {"<value>", "</value>"}, {"<content>", "</content>"}
     };
     
     // File extensions to process (can be set dynamically)
@@ -73,6 +278,17 @@ public:
         std::string original_text;
     };
     
+    // A match while a file is being processed; the strings live in the file's arena
+    struct RawChunk {
+        std::string_view text;
+        std::string_view file_path;
+        size_t line_number;
+        size_t column_start;
+        size_t column_end;
+        std::string_view context;
+        std::string_view original_text;
+    };
+    
     struct ExtractionResult {
         std::vector<TextChunk> chunks;
         size_t total_files_processed;
@@ -81,21 +297,31 @@ public:
     };
     
     // Fast file scanning with C++ filesystem
-    std::vector<std::string> scan_directory(const std::string& directory_path) {
+    std::vector<std::string> scan_directory(const std::string& directory_path, bool recursive = true) {
         std::vector<std::string> files;
         
+        auto add_if_supported = [&](const fs::directory_entry& entry) {
+            if (entry.is_regular_file()) {
+                std::string file_path = entry.path().string();
+                std::string extension = entry.path().extension().string();
+                
+                // Convert to lowercase for comparison
+                std::transform(extension.begin(), extension.end(), extension.begin(), ::tolower);
+                
+                if (std::find(supported_extensions.begin(), supported_extensions.end(), extension) != supported_extensions.end()) {
+                    files.push_back(file_path);
+                }
+            }
+        };
+        
         try {
-            for (const auto& entry : fs::recursive_directory_iterator(directory_path)) {
-                if (entry.is_regular_file()) {
-                    std::string file_path = entry.path().string();
-                    std::string extension = entry.path().extension().string();
-                    
-                    // Convert to lowercase for comparison
-                    std::transform(extension.begin(), extension.end(), extension.begin(), ::tolower);
-                    
-                    if (std::find(supported_extensions.begin(), supported_extensions.end(), extension) != supported_extensions.end()) {
-                        files.push_back(file_path);
-                    }
+            if (recursive) {
+                for (const auto& entry : fs::recursive_directory_iterator(directory_path)) {
+                    add_if_supported(entry);
+                }
+            } else {
+                for (const auto& entry : fs::directory_iterator(directory_path)) {
+                    add_if_supported(entry);
                 }
             }
         } catch (const std::exception& e) {
@@ -106,8 +332,8 @@ public:
     }
     
     // Fast text extraction from a single file
-    std::vector<TextChunk> extract_from_file(const std::string& file_path) {
-        std::vector<TextChunk> chunks;
+    std::vector<RawChunk> extract_from_file(const std::string& file_path, Arena& arena) {
+        std::vector<RawChunk> chunks;
         
         try {
             std::ifstream file(file_path);
@@ -121,29 +347,54 @@ public:
             while (std::getline(file, line)) {
                 line_number++;
                 
-                for (const auto& pattern : text_patterns) {
-                    std::sregex_iterator iter(line.begin(), line.end(), pattern);
-                    std::sregex_iterator end;
+                if (find_delim(line.data(), line.size()) == line.size()) {
+                    continue;
+                }
+                
+                // The line is copied into the arena on its first match; the
+                // chunks' context and original text then point into that copy
+                std::string_view context;
+                bool context_copied = false;
+                
+                auto add = [&](const Match& match) {
+                    // Clean up the text
+                    std::string text = clean_text(line.substr(match.text_start, match.text_length));
                     
-                    for (; iter != end; ++iter) {
-                        std::smatch match = *iter;
-                        std::string text = match[1].str();
+                    if (text.length() >= min_text_length) {
+                        if (!context_copied) {
+                            context = arena.copy(line);
+                            context_copied = true;
+                        }
                         
-                        // Clean up the text
-                        text = clean_text(text);
+                        RawChunk chunk;
+                        chunk.text = arena.copy(text);
+                        chunk.file_path = file_path;
+                        chunk.line_number = line_number;
+                        chunk.column_start = match.text_start;
+                        chunk.column_end = match.text_start + match.text_length;
+                        chunk.context = context;
+                        chunk.original_text = context.substr(match.start, match.length);
                         
-                        if (text.length() >= min_text_length) {
-                            TextChunk chunk;
-                            chunk.text = text;
-                            chunk.file_path = file_path;
-                            chunk.line_number = line_number;
-                            chunk.column_start = match.position(1);
-                            chunk.column_end = match.position(1) + match.length(1);
-                            chunk.context = line;
-                            chunk.original_text = match.str();
-                            
-                            chunks.push_back(chunk);
-                        }
+                        chunks.push_back(chunk);
+                    }
+                };
+                
+                // Each pattern's matches in turn, as the regexes used to give them
+                Match match;
+                for (char quote : {'"', '\''}) {
+                    for (size_t from = 0; find_quoted(line, quote, from, match); from = match.start + match.length) {
+                        add(match);
+                    }
+                }
+                for (const auto& key : text_keys) {
+                    for (size_t from = 0; find_assignment(line, key, from, match); from = match.start + match.length) {
+                        add(match);
+                    }
+                }
+                for (const auto& tag : text_tags) {
+                    for (size_t from = 0; find_tag(line, tag.first, tag.second, from, match); 
+                         from = match.start + match.length) {
+                        add(match);
                     }
                 }
             }
@@ -157,32 +408,34 @@ public:
     }
     
     // Split text into chunks of specified size
-    std::vector<TextChunk> split_into_chunks(const std::vector<TextChunk>& chunks) {
-        std::vector<TextChunk> result;
+    std::vector<RawChunk> split_into_chunks(const std::vector<RawChunk>& chunks, Arena& arena) {
+        std::vector<RawChunk> result;
         
         for (const auto& chunk : chunks) {
             if (chunk.text.length() <= max_chunk_size) {
                 result.push_back(chunk);
             } else {
                 // Split long text into smaller chunks
-                std::string text = chunk.text;
+                std::string_view text = chunk.text;
                 size_t start = 0;
                 size_t chunk_id = 0;
                 
                 while (start < text.length()) {
                     size_t end = std::min(start + max_chunk_size, text.length());
                     
-                    // Try to break at word boundary
+                    // Try to break at word boundary; only this chunk's window is
+                    // searched, so text without spaces isn't rescanned back to 0
+                    // for every chunk
                     if (end < text.length()) {
-                        size_t last_space = text.rfind(' ', end);
-                        if (last_space != std::string::npos && last_space > start) {
-                            end = last_space;
+                        size_t last_space = text.substr(start + 1, end - start).rfind(' ');
+                        if (last_space != std::string_view::npos) {
+                            end = start + 1 + last_space;
                         }
                     }
                     
-                    TextChunk new_chunk = chunk;
+                    RawChunk new_chunk = chunk;
                     new_chunk.text = text.substr(start, end - start);
-                    new_chunk.file_path += "_chunk_" + std::to_string(chunk_id);
+                    new_chunk.file_path = arena.copy(std::string(chunk.file_path) + "_chunk_" + std::to_string(chunk_id));
                     result.push_back(new_chunk);
                     
                     start = end;
@@ -197,24 +450,29 @@ public:
         return result;
     }
     
+    // Copy the finished chunks out of the arena into owning strings
+    static void materialize(const std::vector<RawChunk>& raw_chunks, std::vector<TextChunk>& chunks) {
+        for (const auto& raw : raw_chunks) {
+            chunks.push_back(TextChunk{std::string(raw.text), std::string(raw.file_path), raw.line_number, 
+                                       raw.column_start, raw.column_end, std::string(raw.context), 
+                                       std::string(raw.original_text)});
+        }
+    }
+    
     // Main extraction function
-    ExtractionResult extract_texts(const std::string& directory_path) {
+    ExtractionResult extract_texts(const std::string& directory_path, bool recursive = true) {
         auto start_time = std::chrono::high_resolution_clock::now();
         
         ExtractionResult result;
         
         // Scan directory for files
-        std::vector<std::string> files = scan_directory(directory_path);
+        std::vector<std::string> files = scan_directory(directory_path, recursive);
         result.total_files_processed = files.size();
         
-        // Extract texts from all files
+        // Extract texts from all files, splitting them into manageable chunks
         for (const auto& file_path : files) {
-            std::vector<TextChunk> file_chunks = extract_from_file(file_path);
-            result.chunks.insert(result.chunks.end(), file_chunks.begin(), file_chunks.end());
+            append_file_chunks(file_path, result.chunks);
         }
-        
-        // Split into manageable chunks
-        result.chunks = split_into_chunks(result.chunks);
         result.total_texts_found = result.chunks.size();
         
         auto end_time = std::chrono::high_resolution_clock::now();
@@ -224,6 +482,13 @@ public:
         return result;
     }
     
+    // Extract and split the texts of a single file, for callers that walk the tree themselves
+    std::vector<TextChunk> extract_file(const std::string& file_path) {
+        std::vector<TextChunk> chunks;
+        append_file_chunks(file_path, chunks);
+        return chunks;
+    }
+    
     // Save extracted texts to files
     void save_extracted_texts(const std::vector<TextChunk>& chunks, const std::string& output_dir) {
         try {
@@ -321,6 +586,16 @@ public:
     }
 
 private:
+    void append_file_chunks(const std::string& file_path, std::vector<TextChunk>& chunks) {
+        // One arena per thread, so extract_file can run on several threads at
+        // once; its first block is kept from one file to the next
+        static thread_local Arena arena;
+        arena.pool_reuse();
+        
+        std::vector<RawChunk> raw_chunks = split_into_chunks(extract_from_file(file_path, arena), arena);
+        materialize(raw_chunks, chunks);
+    }
+    
     std::string clean_text(const std::string& text) {
         std::string cleaned = text;
         
@@ -344,14 +619,58 @@ private:
     }
 };
 
+#ifdef TEXT_EXTRACTOR_NANOBIND
+NB_MODULE(text_extractor, m) {
+    m.doc() = "Fast text extraction and translation management for game localization";
+    
+    nb::class_<TextExtractor>(m, "TextExtractor")
+        .def(nb::init<>())
+        // The long-running calls only touch C++ data once their arguments are
+        // converted, so they release the GIL and can run on Python threads in parallel
+        .def("extract_texts", &TextExtractor::extract_texts, "Extract texts from directory", 
+             nb::arg("directory_path"), nb::arg("recursive") = true, 
+             nb::call_guard<nb::gil_scoped_release>())
+        .def("extract_file", &TextExtractor::extract_file, "Extract texts from a single file", 
+             nb::call_guard<nb::gil_scoped_release>())
+        .def("save_extracted_texts", &TextExtractor::save_extracted_texts, "Save extracted texts to files", 
+             nb::call_guard<nb::gil_scoped_release>())
+        .def("apply_translations", &TextExtractor::apply_translations, "Apply translations to files", 
+             nb::call_guard<nb::gil_scoped_release>())
+        .def("set_supported_extensions", &TextExtractor::set_supported_extensions, "Set supported file extensions")
+        .def("get_supported_extensions", &TextExtractor::get_supported_extensions, "Get current supported file extensions");
+    
+    nb::class_<TextExtractor::TextChunk>(m, "TextChunk")
+        .def_ro("text", &TextExtractor::TextChunk::text)
+        .def_ro("file_path", &TextExtractor::TextChunk::file_path)
+        .def_ro("line_number", &TextExtractor::TextChunk::line_number)
+        .def_ro("column_start", &TextExtractor::TextChunk::column_start)
+        .def_ro("column_end", &TextExtractor::TextChunk::column_end)
+        .def_ro("context", &TextExtractor::TextChunk::context)
+        .def_ro("original_text", &TextExtractor::TextChunk::original_text);
+    
+    nb::class_<TextExtractor::ExtractionResult>(m, "ExtractionResult")
+        .def_ro("chunks", &TextExtractor::ExtractionResult::chunks)
+        .def_ro("total_files_processed", &TextExtractor::ExtractionResult::total_files_processed)
+        .def_ro("total_texts_found", &TextExtractor::ExtractionResult::total_texts_found)
+        .def_ro("processing_time", &TextExtractor::ExtractionResult::processing_time);
+}
+#else
 PYBIND11_MODULE(text_extractor, m) {
     m.doc() = "Fast text extraction and translation management for game localization";
     
     py::class_<TextExtractor>(m, "TextExtractor")
         .def(py::init<>())
-        .def("extract_texts", &TextExtractor::extract_texts, "Extract texts from directory")
-        .def("save_extracted_texts", &TextExtractor::save_extracted_texts, "Save extracted texts to files")
-        .def("apply_translations", &TextExtractor::apply_translations, "Apply translations to files")
+        // The long-running calls only touch C++ data once their arguments are
+        // converted, so they release the GIL and can run on Python threads in parallel
+        .def("extract_texts", &TextExtractor::extract_texts, "Extract texts from directory", 
+             py::arg("directory_path"), py::arg("recursive") = true, 
+             py::call_guard<py::gil_scoped_release>())
+        .def("extract_file", &TextExtractor::extract_file, "Extract texts from a single file", 
+             py::call_guard<py::gil_scoped_release>())
+        .def("save_extracted_texts", &TextExtractor::save_extracted_texts, "Save extracted texts to files", 
+             py::call_guard<py::gil_scoped_release>())
+        .def("apply_translations", &TextExtractor::apply_translations, "Apply translations to files", 
+             py::call_guard<py::gil_scoped_release>())
         .def("set_supported_extensions", &TextExtractor::set_supported_extensions, "Set supported file extensions")
         .def("get_supported_extensions", &TextExtractor::get_supported_extensions, "Get current supported file extensions");
     
@@ -370,3 +689,4 @@ PYBIND11_MODULE(text_extractor, m) {
         .def_readonly("total_texts_found", &TextExtractor::ExtractionResult::total_texts_found)
         .def_readonly("processing_time", &TextExtractor::ExtractionResult::processing_time);
 }
+#endif